@@ -1,28 +1,42 @@
 #!/usr/bin/env python3
 # ── v6 (2025-06-07)
 import random   # 你之前已经 import 过，这里确保存在即可
-import re, random, sys
+import re, random, sys, os, pickle, zipfile
 from dataclasses import dataclass
-from typing import List
-from docx import Document
+from itertools import compress
+from typing import Iterator, List, Tuple
+from lxml import etree
 from rich.console import Console
 from rich.prompt  import Prompt
-import textwrap
+__version__  = "6.3"                # 改动 Question 结构时务必递增，旧缓存随之失效
 DOCX_FILE    = "full_answer.docx"   # ← 只解析这一个文件
+CACHE_FILE   = DOCX_FILE + ".pkl"   # 解析结果缓存（按 mtime 失效）
 NUM_PRACTICE = 40                   # 模式1题量
 MC_RATIO     = 0.6                  # 模式1选择题比例
 LEAD_JUNK = re.compile(r"^[\s、，,．\.]+")
 
 console = Console()
+ANSWER_PROMPT = Prompt("[yellow]Your answer", console=console)   # 复用，不必每题重建
 
 # ---------- 数据类 ----------
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Question:
     qid: str
     stem: str
-    options: List[str]      # 选项行（可为空）
+    options: Tuple[str, ...]  # 选项行（可为空）
     answer: str             # 'A' / 'B'…
     qtype: str              # "mc" / "tf"
+    parsed_opts: Tuple[Tuple[str, str], ...] = ()  # build() 时预先拆好的 (字母, 正文)
+
+TF_OPTS = (("A", "正确"), ("B", "错误"))   # 判断题固定两个选项
+
+MC_TAG  = ord("m")          # qtype 首字节，用于 qtype_tags() 紧凑数组
+MC_MASK = bytes(c == MC_TAG for c in range(256))   # translate 表：选择题 → 1，其余 → 0
+TF_MASK = bytes(c != MC_TAG for c in range(256))
+
+def qtype_tags(bank: List[Question]) -> bytes:
+    """每题一个字节（b'm' / b't'），与 bank 下标一一对应"""
+    return bytes(ord(q.qtype[0]) for q in bank)
 
 DEBUG      = False                 # True 时打印详细日志
 Q_HEAD     = re.compile(r"^\s*(?:Q\s*)?(\d+)[\s\.\、\．\)\）]\s*(.*)", re.I)
@@ -32,15 +46,77 @@ ANS_PAT = re.compile(
     r"\s*[:：—\-]?\s*[\(（]?\s*([A-E]|正确|错误|对|错)\s*[\)）]?",
     re.I
 )
+SINGLE_ANS = re.compile(r"(?:[A-D]|正确|错误|对|错)", re.I)        # 单独成行的答案
+
+# 四类行合并成一个正则，每段只扫一遍；按 m.lastgroup 分派
+#   顺序即优先级：题号行 > 答案行（可出现在行内任意位置）> 选项行 > 单独答案
+LINE_KINDS = [
+    ("qhead",  Q_HEAD.pattern),
+    ("ans",    r"(?s:.*?)" + ANS_PAT.pattern),
+    ("opt",    OPT_PAT.pattern),
+    ("single", SINGLE_ANS.pattern + r"\Z"),
+]
+LINE_PAT = re.compile("|".join(f"(?P<{n}>{p})" for n, p in LINE_KINDS), re.I)
+# 首字符不是数字 / Q 的行不可能是题号行，用去掉 qhead 分支的版本
+BODY_PAT = re.compile("|".join(f"(?P<{n}>{p})" for n, p in LINE_KINDS[1:]), re.I)
+_QH_GRP = LINE_PAT.groupindex["qhead"]       # Q_HEAD 的两个捕获组紧随其后
 
 
 TF_MAP = {"正确": "A", "对": "A", "ERROR": "B", "错误": "B", "错": "B",
           "TRUE": "A", "T": "A", "FALSE": "B", "F": "B"}
 
 def tidy_tf(ans_raw: str) -> str:
+    if len(ans_raw) == 1:                # 快速路径：已是单个 A/B
+        u = ans_raw.upper()
+        if u in ("A", "B"):
+            return u
     s = ans_raw.strip().upper()
     return TF_MAP.get(s, s[:1])  # 如果匹配不到取首字母
 
+def split_opt(raw: str) -> Tuple[str, str]:
+    """
+    选项行 → (字母, 正文)，识别规则同 r"\s*([A-E])[\s\.\、]\s*(.*)" 但不走正则
+    与该正则不同：正文里的换行及其后的文字会保留（正则的 .* 在换行处截断）
+    不是 "A. xxx" 形式时字母为空，整行当正文
+    """
+    s = raw.lstrip()
+    if len(s) >= 2 and s[0].upper() in "ABCDE" and (s[1] in ".、" or s[1].isspace()):
+        return s[0].upper(), s[2:].strip()
+    return "", raw.strip()
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BR   = W_NS + "br"
+# run 内各元素对应的文字，与 python-docx 的 Run.text 相同；None 表示取元素自身文本
+W_TEXT = {W_NS + "t": None, W_NS + "tab": "\t", W_NS + "ptab": "\t", W_NS + "cr": "\n",
+          W_NS + "noBreakHyphen": "-", W_BR: "\n"}
+
+def iter_paragraphs(path: str) -> Iterator[str]:
+    """
+    直接流式读取 word/document.xml，逐段产出纯文本
+    与 python-docx 的 doc.paragraphs 一致：只取 w:body 下的直接段落，
+    段内只读 w:r / w:hyperlink 里的文字（表格、文本框不计入）
+    每段读完即清空并删掉前面已处理的兄弟节点，内存只随单段增长
+    """
+    body = W_NS + "body"
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        for _, p in etree.iterparse(f, tag=W_NS + "p"):
+            parent = p.getparent()
+            if parent is None or parent.tag != body:
+                continue                  # 表格 / 文本框内的段落，随上层节点一起释放
+            parts = []
+            for run in p.iterchildren(W_NS + "r", W_NS + "hyperlink"):
+                runs = run.iterchildren(W_NS + "r") if run.tag == W_NS + "hyperlink" else (run,)
+                for r in runs:
+                    for el in r.iterchildren(*W_TEXT):
+                        if el.tag == W_BR and el.get(W_NS + "type", "textWrapping") != "textWrapping":
+                            continue      # 分页 / 分栏符不产生文字
+                        fixed = W_TEXT[el.tag]
+                        parts.append((el.text or "") if fixed is None else fixed)
+            p.clear()
+            while p.getprevious() is not None:
+                del parent[0]
+            yield "".join(parts)
+
 def parse_docx(path: str) -> list:
     """
     解析 full_answer.docx → List[Question]
@@ -51,31 +127,34 @@ def parse_docx(path: str) -> list:
       3. 判断题没有选项行，用 build() 里逻辑统一归一化 A/B
       4. 若仍找不到答案，则 DEBUG 打印 [MISS-ANS]
     """
-    doc  = Document(path)
     qs   = []
 
     idx  = None                   # 当前题号
-    stem = ""                     # 题干（累计多行）
+    stem_parts = []               # 题干（累计多行，建题时再 join）
     opts = []                     # 选项行
     ans  = ""                     # 正确答案（A/B/正确/错误）
 
-    for para in doc.paragraphs:
-        txt = para.text.strip()
+    for para in iter_paragraphs(path):
+        txt = para.strip()
         if not txt:
             continue
 
+        first = txt[0]
+        pat   = LINE_PAT if first.isdigit() or first in "Qq" else BODY_PAT
+        m     = pat.match(txt)
+        kind  = m.lastgroup if m else None
+
         # ---------- (1) 题号行 ----------
-        m = Q_HEAD.match(txt)
-        if m:
+        if kind == "qhead":
             # <- 保存上一题（若已找到答案）
             if idx and ans:
-                qs.append(build(idx, stem, opts, ans))
+                qs.append(build(idx, " ".join(stem_parts), opts, ans))
             elif idx and DEBUG:
-                print(f"[MISS-ANS] Q{idx} | stem='{stem[:40]}…'")
+                print(f"[MISS-ANS] Q{idx} | stem='{' '.join(stem_parts)[:40]}…'")
 
             # 解析新题
-            idx  = m.group(1)
-            rest = m.group(2)          # 题干 + 可能的 inline 答案
+            idx  = m.group(_QH_GRP + 1)
+            rest = m.group(_QH_GRP + 2)   # 题干 + 可能的 inline 答案
             opts, ans = [], ""
 
             # 如果这一行就带“参考答案”
@@ -85,16 +164,15 @@ def parse_docx(path: str) -> list:
                 rest = ANS_PAT.sub("", rest).strip()   # 去掉答案字段
                 rest = LEAD_JUNK.sub("", rest)     # ★ 新增
 
-            stem = rest
+            stem_parts = [rest]
             if DEBUG:
                 tag = f" [inline-ANS={ans}]" if ans else ""
-                print(f"\n[NEW]  Q{idx}  {stem[:50]}…{tag}")
+                print(f"\n[NEW]  Q{idx}  {rest[:50]}…{tag}")
             continue
 
         # ---------- (2) 答案行（单独成段或跟在选项后） ----------
-        hit = ANS_PAT.search(txt)
-        if hit:
-            ans = hit.group(1).strip()
+        if kind == "ans":
+            ans = ANS_PAT.search(txt).group(1).strip()
             if DEBUG:
                 print(f"  [ANS]  {ans}  ← '{txt[:60]}…'")
             # 同一行如果还含选项文字，也当作选项保存
@@ -103,29 +181,29 @@ def parse_docx(path: str) -> list:
             continue
 
         # ---------- (3) 选项行 ----------
-        if OPT_PAT.match(txt):
+        if kind == "opt":
             opts.append(txt)
             if DEBUG:
                 print(f"  [OPT]  {txt[:60]}…")
             continue
 
         # ---------- (4) 单独的字母或“正确/错误”行作为答案 ----------
-        if idx and not ans and re.fullmatch(r"(?:[A-D]|正确|错误|对|错)", txt, re.I):
+        if kind == "single" and idx and not ans:
             ans = txt
             if DEBUG:
                 print(f"  [ANS-SINGLE]  {ans}")
             continue
 
         # ---------- (5) 题干续行 ----------
-        stem += " " + txt
+        stem_parts.append(txt)
         if DEBUG:
             print(f"  [STEM+] {txt[:60]}…")
 
     # ---------- 收尾 ----------
     if idx and ans:
-        qs.append(build(idx, stem, opts, ans))
+        qs.append(build(idx, " ".join(stem_parts), opts, ans))
     elif idx and DEBUG:
-        print(f"[MISS-ANS] Q{idx} | stem='{stem[:40]}…'")
+        print(f"[MISS-ANS] Q{idx} | stem='{' '.join(stem_parts)[:40]}…'")
 
     return qs
 
@@ -136,7 +214,36 @@ def build(idx, stem, opts, ans_raw) -> Question:
     ans   = ans_raw.upper()
     if qtype == "tf":
         ans = tidy_tf(ans)
-    return Question(idx, stem.strip(), opts[:], ans, qtype)
+    # 题型 / 答案 / 选项字母取值很少，驻留后 == 比较可直接命中同一对象
+    # （pickle 缓存按对象去重，读回后仍共享同一份字符串）
+    ans, qtype = sys.intern(ans), sys.intern(qtype)
+    if opts:
+        parsed = tuple((sys.intern(l), t) for l, t in map(split_opt, opts))
+    else:
+        parsed = TF_OPTS
+    return Question(idx, stem.strip(), tuple(opts), ans, qtype, parsed)
+
+def load_bank(path: str = DOCX_FILE, cache: str = CACHE_FILE) -> List[Question]:
+    """
+    读取题库；优先使用 pickle 缓存，docx 更新或版本变化时重新解析
+    缓存格式：(__version__, List[Question])
+    """
+    try:
+        if os.path.getmtime(cache) >= os.path.getmtime(path):
+            with open(cache, "rb") as f:
+                ver, qs = pickle.load(f)
+            if ver == __version__:
+                return qs
+    except Exception:                     # 缓存只是加速手段：不存在 / 损坏 → 重新解析
+        pass
+
+    qs = parse_docx(path)
+    try:
+        with open(cache, "wb") as f:
+            pickle.dump((__version__, qs), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass                              # 目录只读时不缓存即可
+    return qs
 
 # ---------- 交互 ----------
 def ask(q: Question, cur: int, tot: int) -> bool:
@@ -147,35 +254,21 @@ def ask(q: Question, cur: int, tot: int) -> bool:
     # 显示进度，而不是 Word 原来的题号
     console.rule(f"[bold cyan]Question {cur}/{tot}")
 
-    # —— 题干换行输出 ——
-    term_width = console.size.width or 80
-    wrapped = textwrap.fill(q.stem, width=term_width)
-    console.print(wrapped, style="bold")
+    # —— 题干输出（Rich 按终端宽度自动换行） ——
+    console.print(q.stem, style="bold")
 
-    # ---------- 构造 (letter, clean_text) ----------
-    if not q.options:                      # 判断题
-        raw_opts = [("A", "正确"), ("B", "错误")]
-    else:
-        raw_opts = []
-        for raw in q.options:
-            m = re.match(r"\s*([A-E])[\s\.\、]\s*(.*)", raw, re.I)
-            if m:
-                raw_opts.append((m.group(1).upper(), m.group(2).strip()))
-            else:                          # fallback：整行当正文
-                raw_opts.append(("", raw.strip()))
-
-    random.shuffle(raw_opts)               # 打乱顺序
-
-    # ---------- 显示 & 建立映射 ----------
-    num2letter, letter2num = {}, {}
-    for idx, (letter, text) in enumerate(raw_opts, 1):
-        console.print(f"  {idx}. {text}")  # 仅数字 + 文本
-        if letter:
-            num2letter[str(idx)] = letter
-            letter2num[letter] = str(idx)
+    opts = q.parsed_opts                   # (letter, clean_text)，build() 时已拆好
+    perm = list(range(len(opts)))          # 只打乱下标，不复制选项
+    random.shuffle(perm)
+    letters = [opts[i][0] for i in perm]   # 显示序号-1 → 字母
+
+    # ---------- 显示（拼成一段，只调用一次 print） ----------
+    console.print("\n".join(f"  {num}. {opts[i][1]}"   # 仅数字 + 文本
+                            for num, i in enumerate(perm, 1)))
 
     # ---------- 收答 ----------
-    inp = Prompt.ask("[yellow]Your answer").strip().upper()
+    inp = ANSWER_PROMPT().strip().upper()
+    num2letter  = {str(n): l for n, l in enumerate(letters, 1) if l}
     user_letter = num2letter.get(inp, inp)    # 数字→字母；字母留字母
     correct     = (user_letter == q.answer)
 
@@ -184,8 +277,12 @@ def ask(q: Question, cur: int, tot: int) -> bool:
         console.print("✅  Correct!", style="bold green")
     else:
         # 找到正确数字编号 + 文本
-        right_num  = letter2num.get(q.answer, "?")
-        right_text = next((t for l, t in raw_opts if l == q.answer), "")
+        if q.answer in letters:
+            pos        = letters.index(q.answer)
+            right_num  = pos + 1
+            right_text = opts[perm[pos]][1]
+        else:
+            right_num, right_text = "?", ""
         console.print(
             f"❌  Wrong!  Correct: {right_num}. {right_text}",
             style="bold red"
@@ -206,30 +303,35 @@ def run_quiz(pool: List[Question]):
     
 
 
-def mode_one(bank: List[Question]):
+def mode_one(bank: List[Question], qtypes: bytes):
     mc_need = round(NUM_PRACTICE * MC_RATIO)
     tf_need = NUM_PRACTICE - mc_need
-    mc_pool = [q for q in bank if q.qtype == "mc"]
-    tf_pool = [q for q in bank if q.qtype == "tf"]
+    # 字节数组 → 0/1 掩码 → 下标，全程在 C 层完成，不逐题跑 Python 循环
+    every  = range(len(qtypes))
+    mc_idx = list(compress(every, qtypes.translate(MC_MASK)))
+    tf_idx = list(compress(every, qtypes.translate(TF_MASK)))
     # 防止题量不足
-    mc_need = min(mc_need, len(mc_pool))
-    tf_need = min(tf_need, len(tf_pool))
-    selected = random.sample(mc_pool, mc_need) + random.sample(tf_pool, tf_need)
-    random.shuffle(selected)
-    run_quiz(selected)
+    mc_need = min(mc_need, len(mc_idx))
+    tf_need = min(tf_need, len(tf_idx))
+    # 只在下标上抽样 / 打乱，最后一次性取题
+    # 末尾的 shuffle 不能省：两段拼接后选择题总在前面
+    picked = random.sample(mc_idx, mc_need) + random.sample(tf_idx, tf_need)
+    random.shuffle(picked)
+    run_quiz([bank[i] for i in picked])
 
 def mode_two(bank: List[Question]):
-    random.shuffle(bank)
-    run_quiz(bank)
+    # 打乱副本，保持 bank 与 qtypes 下标对齐
+    run_quiz(random.sample(bank, len(bank)))
 
 # ---------- 主函数 ----------
 def main():
-    bank = parse_docx(DOCX_FILE)
+    bank   = load_bank()
+    qtypes = qtype_tags(bank)
     console.print(f"[bold green]题库已加载：{len(bank)} 题[/]")
     while True:
         mode = Prompt.ask(f"\n选择模式 1) 随机{NUM_PRACTICE}题  2) 全部练习  q) 退出")
         if mode == "1":
-            mode_one(bank)
+            mode_one(bank, qtypes)
         elif mode == "2":
             mode_two(bank)
         elif mode.lower() == "q":